@@ -5,21 +5,52 @@ import pulumi_kubernetes as k8s
 
 from components.lz import LandingZone
 from components.cluster import CompliantCluster
+from components.lb_controller import LoadBalancerController
+from components.registry_cache import RegistryCache
 
 
 config = pulumi.Config()
 
 SERVICE_NAME = "eks-helm"
 
+# How the apache service is exposed:
+#  - clb: in-tree Classic ELB routing through NodePorts (default)
+#  - nlb: NLB with IP targets, managed by the AWS Load Balancer Controller
+#  - alb: ALB with IP targets, managed by the AWS Load Balancer Controller
+INGRESS_MODE = config.get("ingressMode") or "clb"
+if INGRESS_MODE not in ("clb", "nlb", "alb"):
+    raise ValueError(f"unsupported ingressMode '{INGRESS_MODE}', expected one of: clb, nlb, alb")
+
+ZONE_TOPOLOGY_KEY = "topology.kubernetes.io/zone"
+
 landing_zone = LandingZone(SERVICE_NAME,
     cidr_block=config.require("cidrBlock"),
     subnet_mask=config.require("subnetMask")
 )
 
+# Optionally pull the chart images through ECR, from within the region
+registry_cache = None
+node_local_dns = config.get_object("nodeLocalDns") if config.get("nodeLocalDns") else None
+
+if config.get_bool("pullThroughCache"):
+    docker_hub_username = config.get("dockerHubUsername") or None
+
+    registry_cache = RegistryCache(SERVICE_NAME,
+        owner="aureq@pulumi.com",
+        docker_hub_username=docker_hub_username,
+        docker_hub_access_token=config.get_secret("dockerHubAccessToken") if docker_hub_username else None
+    )
+
+    if node_local_dns is not None and "k8s" in registry_cache.registry_urls:
+        node_local_dns.setdefault("image_registry", registry_cache.registry_urls["k8s"])
+
 compliant_cluster = CompliantCluster(SERVICE_NAME,
     owner="aureq@pulumi.com",
     vpc_id=landing_zone.vpc.id,
     subnet_ids=landing_zone.public_subnet_ids,
+    pull_through_cache_prefixes=registry_cache.repository_prefixes if registry_cache else None,
+    # e.g. `nodeLocalDns: {}` for the defaults, or `{cache_success_size: 20000}`
+    node_local_dns=node_local_dns,
     opts=pulumi.ResourceOptions(parent=landing_zone)
 )
 
@@ -36,16 +67,76 @@ namespace = k8s.core.v1.Namespace(f"{SERVICE_NAME}-k8s-ns",
     )
 )
 
+apache_zones = pulumi.Output.from_input(landing_zone.availability_zones)
+
+# Default to one apache pod per default cluster node
+apache_replicas = config.get_int("apacheReplicas")
+if apache_replicas is None:
+    apache_replicas = 2
+
+apache_values = {
+    "replicaCount": apache_replicas,
+    # Keep the pods evenly spread across the zones hosting nodes
+    "topologySpreadConstraints": [{
+        "maxSkew": 1,
+        "topologyKey": ZONE_TOPOLOGY_KEY,
+        "whenUnsatisfiable": "DoNotSchedule",
+        "labelSelector": {
+            "matchLabels": {
+                "app.kubernetes.io/name": "apache",
+                "app.kubernetes.io/instance": f"{SERVICE_NAME}-apache-chart",
+            },
+        },
+    }],
+    "service": {
+        "annotations": {
+            # Topology aware routing, keep in-cluster traffic in the client zone
+            "service.kubernetes.io/topology-mode": "Auto",
+        },
+    },
+}
+apache_depends_on = []
+
+if registry_cache is not None and "docker-hub" in registry_cache.registry_urls:
+    # Rewrite every bitnami image (apache, git, metrics) to the cache
+    apache_values["global"] = {
+        "imageRegistry": registry_cache.registry_urls["docker-hub"],
+    }
+
+if INGRESS_MODE != "clb":
+    lb_controller = LoadBalancerController(SERVICE_NAME,
+        eks_cluster=compliant_cluster.eks_cluster,
+        vpc_id=landing_zone.vpc.id,
+        kubernetes_provider=compliant_cluster.kuberntes_provider,
+        image_registry=registry_cache.registry_urls.get("ecr-public") if registry_cache else None,
+        opts=pulumi.ResourceOptions(parent=compliant_cluster)
+    )
+    # The controller webhooks must be up before any Service/Ingress is created
+    apache_depends_on.append(lb_controller.release)
+
+if INGRESS_MODE == "nlb":
+    apache_values["service"]["type"] = "LoadBalancer"
+    apache_values["service"]["annotations"].update({
+        "service.beta.kubernetes.io/aws-load-balancer-type": "external",
+        "service.beta.kubernetes.io/aws-load-balancer-nlb-target-type": "ip",
+        "service.beta.kubernetes.io/aws-load-balancer-scheme": "internet-facing",
+    })
+elif INGRESS_MODE == "alb":
+    # The ALB targets the pod IPs directly, no NodePort needed
+    apache_values["service"]["type"] = "ClusterIP"
+
 apache_chart = k8s.helm.v3.Chart(f"{SERVICE_NAME}-apache-chart", k8s.helm.v3.ChartOpts(
     namespace=namespace.metadata.name,
     chart='apache',
     version='11.2.4',
+    values=apache_values,
     fetch_opts={
         'repo': 'https://charts.bitnami.com/bitnami'
     }),
     opts=pulumi.ResourceOptions(
         parent=namespace,
-        provider=compliant_cluster.kuberntes_provider
+        provider=compliant_cluster.kuberntes_provider,
+        depends_on=apache_depends_on
     )
 )
 
@@ -71,9 +162,50 @@ apache_service = apache_chart.get_resource("v1/Service",
     namespace.metadata.name
 )
 
+if INGRESS_MODE == "alb":
+    apache_ingress = k8s.networking.v1.Ingress(f"{SERVICE_NAME}-apache-ingress",
+        metadata=k8s.meta.v1.ObjectMetaArgs(
+            namespace=namespace.metadata.name,
+            annotations={
+                "alb.ingress.kubernetes.io/scheme": "internet-facing",
+                "alb.ingress.kubernetes.io/target-type": "ip",
+            }
+        ),
+        spec=k8s.networking.v1.IngressSpecArgs(
+            ingress_class_name="alb",
+            rules=[k8s.networking.v1.IngressRuleArgs(
+                http=k8s.networking.v1.HTTPIngressRuleValueArgs(
+                    paths=[k8s.networking.v1.HTTPIngressPathArgs(
+                        path="/",
+                        path_type="Prefix",
+                        backend=k8s.networking.v1.IngressBackendArgs(
+                            service=k8s.networking.v1.IngressServiceBackendArgs(
+                                name=apache_service.metadata.name,
+                                port=k8s.networking.v1.ServiceBackendPortArgs(
+                                    name="http"
+                                )
+                            )
+                        )
+                    )]
+                )
+            )]
+        ),
+        opts=pulumi.ResourceOptions(
+            parent=namespace,
+            provider=compliant_cluster.kuberntes_provider,
+            depends_on=apache_depends_on
+        )
+    )
+    apache_load_balancer = apache_ingress.status.load_balancer
+else:
+    apache_load_balancer = apache_service.status.load_balancer
+
 pulumi.export("vpc_id", landing_zone.vpc.id)
 pulumi.export("kubeconfig", compliant_cluster.kubeconfig)
+pulumi.export("ingress_mode", INGRESS_MODE)
+pulumi.export("apache_zones", apache_zones)
+pulumi.export("apache_replicas", apache_replicas)
 
-# # Get the service public IP address
-apache_service_hostname = apache_service.status.load_balancer.ingress[0].hostname
+# # Get the load balancer public hostname
+apache_service_hostname = apache_load_balancer.ingress[0].hostname
 pulumi.export('apache_service_hostname', apache_service_hostname)
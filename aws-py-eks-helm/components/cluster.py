@@ -3,13 +3,15 @@ Fully compliant EKS cluster Component resource.
 Fully compliant and standardized EKS cluster, ready for app deployments
 """
 import json
-from typing import Optional, List
+from typing import Optional, List, Sequence
 
 import pulumi
 import pulumi_aws as aws
 import pulumi_eks as eks
 import pulumi_kubernetes as k8s
 
+from components.nodelocaldns import NodeLocalDnsCache, NodeLocalDnsCacheArgs, check_node_local_dns_args
+
 class CompliantCluster(pulumi.ComponentResource):
     """
     Compliant EKS Component resource
@@ -20,7 +22,7 @@ class CompliantCluster(pulumi.ComponentResource):
     The VPC ID used to hosted our EKS cluster
     """
 
-    subnet_ids: List[pulumi.Input[str]]
+    subnet_ids: pulumi.Input[Sequence[pulumi.Input[str]]]
     """
     A list of subnets used to deploy our EKS nodes
     """
@@ -60,11 +62,22 @@ class CompliantCluster(pulumi.ComponentResource):
     A valid Pulumi Kubernetes provider to manage this EKS cluster
     """
 
+    pull_through_cache_prefixes: List[str]
+    """
+    The ECR pull-through cache repository prefixes the nodes may pull from
+    """
+
+    node_local_dns: Optional[NodeLocalDnsCache]
+    """
+    The NodeLocal DNSCache add-on, when enabled
+    """
+
     def __init__(self, name,
                  owner: Optional[pulumi.Input[str]],
                  vpc_id: pulumi.Input[str],
-                 subnet_ids: List[pulumi.Input[str]],
-
+                 subnet_ids: pulumi.Input[Sequence[pulumi.Input[str]]],
+                 pull_through_cache_prefixes: Optional[List[str]] = None,
+                 node_local_dns: Optional[NodeLocalDnsCacheArgs] = None,
                  opts=None):
         """
         Class constructor
@@ -74,6 +87,11 @@ class CompliantCluster(pulumi.ComponentResource):
         self.name = name
         self.vpc_id = vpc_id
         self.subnet_ids = subnet_ids
+        self.pull_through_cache_prefixes = pull_through_cache_prefixes or []
+        self.node_local_dns_args = node_local_dns
+
+        if self.node_local_dns_args is not None:
+            check_node_local_dns_args(self.node_local_dns_args)
 
         if owner is not None:
             self.owner = owner
@@ -87,6 +105,7 @@ class CompliantCluster(pulumi.ComponentResource):
         self.node_group = self._create_node_group()
         self.kubeconfig = self._generate_kubeconfig()
         self.kuberntes_provider = self._create_kubernetes_provider()
+        self.node_local_dns = self._create_node_local_dns()
 
     def _create_iam_eks_cluster_role(self) -> aws.iam.Role:
         """
@@ -124,6 +143,30 @@ class CompliantCluster(pulumi.ComponentResource):
                 opts=pulumi.ResourceOptions(parent=_role)
             )
 
+        if self.pull_through_cache_prefixes:
+            # The first pull of an upstream image creates its ECR repository
+            aws.iam.RolePolicy(f"{self.name}-eks-iam-role-pull-through-cache",
+                role=_role.id,
+                policy=pulumi.Output.all(
+                    aws.get_region_output().name,
+                    aws.get_caller_identity_output().account_id
+                ).apply(lambda args: json.dumps({
+                    'Version': '2012-10-17',
+                    'Statement': [{
+                        'Action': [
+                            'ecr:CreateRepository',
+                            'ecr:BatchImportUpstreamImage',
+                        ],
+                        'Effect': 'Allow',
+                        'Resource': [
+                            f"arn:aws:ecr:{args[0]}:{args[1]}:repository/{prefix}/*"
+                            for prefix in self.pull_through_cache_prefixes
+                        ],
+                    }],
+                })),
+                opts=pulumi.ResourceOptions(parent=_role)
+            )
+
         return _role
 
     # def _create_iam_node_group_role(self) -> aws.iam.Role:
@@ -397,3 +440,19 @@ class CompliantCluster(pulumi.ComponentResource):
             kubeconfig=self.kubeconfig,
             opts=pulumi.ResourceOptions(parent=self)
         )
+
+    def _create_node_local_dns(self) -> Optional[NodeLocalDnsCache]:
+        """
+        Deploy the NodeLocal DNSCache add-on, if requested
+        """
+        if self.node_local_dns_args is None:
+            return None
+
+        return NodeLocalDnsCache(f"{self.name}-nodelocaldns",
+            kubernetes_provider=self.kuberntes_provider,
+            **self.node_local_dns_args,
+            opts=pulumi.ResourceOptions(
+                parent=self,
+                depends_on=[self.node_group]
+            )
+        )
@@ -0,0 +1,174 @@
+"""
+AWS Load Balancer Controller Component resource.
+Lets Kubernetes Services and Ingresses be fronted by NLBs/ALBs using IP targets
+"""
+import json
+import pathlib
+from typing import Optional
+
+import pulumi
+import pulumi_aws as aws
+import pulumi_eks as eks
+import pulumi_kubernetes as k8s
+
+
+_IAM_POLICY_FILE = pathlib.Path(__file__).parent / "policies" / "aws-load-balancer-controller.json"
+
+
+class LoadBalancerController(pulumi.ComponentResource):
+    """
+    AWS Load Balancer Controller Component resource
+    """
+
+    NAMESPACE = "kube-system"
+    SERVICE_ACCOUNT_NAME = "aws-load-balancer-controller"
+
+    iam_policy: aws.iam.Policy
+    """
+    The IAM policy granting the controller access to EC2 and ELBv2
+    """
+
+    iam_role: aws.iam.Role
+    """
+    The IAM role assumed by the controller through the cluster OIDC provider (IRSA)
+    """
+
+    service_account: k8s.core.v1.ServiceAccount
+    """
+    The Kubernetes service account bound to the IAM role
+    """
+
+    release: k8s.helm.v3.Release
+    """
+    The Helm release running the controller
+    """
+
+    def __init__(self, name,
+                 eks_cluster: eks.Cluster,
+                 vpc_id: pulumi.Input[str],
+                 kubernetes_provider: k8s.Provider,
+                 image_registry: Optional[pulumi.Input[str]] = None,
+                 opts=None):
+        """
+        Class constructor
+
+        `image_registry` replaces `public.ecr.aws` for the controller image,
+        e.g. with an ECR pull-through cache.
+        """
+        super().__init__('custom:components:LoadBalancerController', name, {}, opts)
+
+        self.name = name
+        self.eks_cluster = eks_cluster
+        self.vpc_id = vpc_id
+        self.kubernetes_provider = kubernetes_provider
+        self.image_registry = image_registry
+
+        self.iam_policy = self._create_iam_policy()
+        self.iam_role = self._create_iam_role()
+        self.service_account = self._create_service_account()
+        self.release = self._create_release()
+
+    def _create_iam_policy(self) -> aws.iam.Policy:
+        """
+        Create the IAM policy documented upstream for the controller
+        """
+        return aws.iam.Policy(f"{self.name}-lbc-iam-policy",
+            description="AWS Load Balancer Controller",
+            policy=_IAM_POLICY_FILE.read_text(encoding="utf-8"),
+            opts=pulumi.ResourceOptions(parent=self)
+        )
+
+    def _create_iam_role(self) -> aws.iam.Role:
+        """
+        Create the IAM role assumed by the controller service account via the
+        OIDC provider created alongside the EKS cluster
+        """
+        _oidc_provider = self.eks_cluster.core.oidc_provider
+
+        # The provider URL is stored without its scheme, strip it just in case
+        _oidc_issuer = _oidc_provider.url.apply(lambda url: url.removeprefix("https://"))
+
+        _role = aws.iam.Role(f"{self.name}-lbc-iam-role",
+            assume_role_policy=pulumi.Output.all(_oidc_provider.arn, _oidc_issuer).apply(
+                lambda args: json.dumps({
+                    'Version': '2012-10-17',
+                    'Statement': [{
+                        'Action': 'sts:AssumeRoleWithWebIdentity',
+                        'Principal': {
+                            'Federated': args[0]
+                        },
+                        'Effect': 'Allow',
+                        'Condition': {
+                            'StringEquals': {
+                                f"{args[1]}:sub": f"system:serviceaccount:{self.NAMESPACE}:{self.SERVICE_ACCOUNT_NAME}",
+                                f"{args[1]}:aud": "sts.amazonaws.com",
+                            }
+                        }
+                    }],
+                })
+            ),
+            opts=pulumi.ResourceOptions(parent=self)
+        )
+
+        aws.iam.RolePolicyAttachment(f"{self.name}-lbc-iam-role-policy",
+            policy_arn=self.iam_policy.arn,
+            role=_role.id,
+            opts=pulumi.ResourceOptions(parent=_role)
+        )
+
+        return _role
+
+    def _create_service_account(self) -> k8s.core.v1.ServiceAccount:
+        """
+        Create the controller service account annotated with its IAM role
+        """
+        return k8s.core.v1.ServiceAccount(f"{self.name}-lbc-sa",
+            metadata=k8s.meta.v1.ObjectMetaArgs(
+                name=self.SERVICE_ACCOUNT_NAME,
+                namespace=self.NAMESPACE,
+                annotations={
+                    "eks.amazonaws.com/role-arn": self.iam_role.arn,
+                }
+            ),
+            opts=pulumi.ResourceOptions(
+                parent=self,
+                provider=self.kubernetes_provider
+            )
+        )
+
+    def _create_release(self) -> k8s.helm.v3.Release:
+        """
+        Deploy the controller Helm chart
+
+        A Helm release (rather than a Chart) is used so the admission webhook
+        certificates generated by the chart are not rotated on every update.
+        """
+        _values = {
+            "clusterName": self.eks_cluster.eks_cluster.name,
+            "region": aws.get_region_output().name,
+            "vpcId": self.vpc_id,
+            "serviceAccount": {
+                "create": False,
+                "name": self.SERVICE_ACCOUNT_NAME,
+            },
+        }
+
+        if self.image_registry is not None:
+            _values["image"] = {
+                "repository": pulumi.Output.concat(self.image_registry, "/eks/aws-load-balancer-controller"),
+            }
+
+        return k8s.helm.v3.Release(f"{self.name}-lbc",
+            chart="aws-load-balancer-controller",
+            version="1.8.1",
+            namespace=self.NAMESPACE,
+            repository_opts=k8s.helm.v3.RepositoryOptsArgs(
+                repo="https://aws.github.io/eks-charts"
+            ),
+            values=_values,
+            opts=pulumi.ResourceOptions(
+                parent=self,
+                provider=self.kubernetes_provider,
+                depends_on=[self.service_account]
+            )
+        )
@@ -29,19 +29,19 @@ class LandingZone(pulumi.ComponentResource):
     The VPC public route table
     """
 
-    public_subnets: List[aws.ec2.Subnet]
+    public_subnets: pulumi.Output[List[aws.ec2.Subnet]]
     """
-    The public subnet in this VPC
+    The public subnet in this VPC, registered once the zones are known
     """
 
-    public_subnet_ids: List[pulumi.Output[str]]
+    public_subnet_ids: pulumi.Output[List[str]]
     """
     The public subnet IDs in this VPC
     """
 
-    private_subnets: List[aws.ec2.Subnet]
+    private_subnets: pulumi.Output[List[aws.ec2.Subnet]]
     """
-    The private subnet in this VPC
+    The private subnet in this VPC, registered once the zones are known
     """
 
     security_group: aws.ec2.SecurityGroup
@@ -49,6 +49,11 @@ class LandingZone(pulumi.ComponentResource):
     The main security group in this VPC for administrative purpose only
     """
 
+    availability_zones: pulumi.Output[List[str]]
+    """
+    The availability zones spanned by the subnets in this VPC
+    """
+
     def __init__(self, name,
                  cidr_block: Optional[str],
                  subnet_mask: Optional[str],
@@ -74,14 +79,21 @@ class LandingZone(pulumi.ComponentResource):
         main_network = ipaddress.ip_network(address=self.cidr_block)
         self._subnets = list(main_network.subnets(new_prefix=network_with_netmask.prefixlen))
 
-        self._zones = aws.get_availability_zones()
+        # Don't block on the lookup, the zone independent resources below are
+        # registered straight away while the per-zone ones wait for it
+        self._zones = aws.get_availability_zones_output()
+        self.availability_zones = self._zones.names
 
         self.vpc = self._create_vpc()
         self.igw = self._create_internet_gateway()
         self.public_route_table = self._create_route_table()
 
-        self.public_subnets, self.public_subnet_ids = self._create_public_subnets()
-        self.private_subnets = self._create_private_subnets()
+        _zonal_subnets = self.availability_zones.apply(self._create_zonal_subnets)
+        self.public_subnets = _zonal_subnets.apply(lambda subnets: subnets[0])
+        self.public_subnet_ids = self.public_subnets.apply(
+            lambda subnets: pulumi.Output.all(*[subnet.id for subnet in subnets])
+        )
+        self.private_subnets = _zonal_subnets.apply(lambda subnets: subnets[1])
 
         self.security_group = self._create_security_group()
 
@@ -109,20 +121,29 @@ class LandingZone(pulumi.ComponentResource):
             )
         )
 
-    def _create_public_subnets(self) -> Tuple[List[aws.ec2.Subnet], List[pulumi.Output[str]]]:
+    def _create_zonal_subnets(self, zones: List[str]) -> Tuple[List[aws.ec2.Subnet], List[aws.ec2.Subnet]]:
+        """
+        Create the public and private Subnets once the availability zones are known
+        """
+        return self._create_public_subnets(zones), self._create_private_subnets(zones)
+
+    def _create_public_subnets(self, zones: List[str]) -> List[aws.ec2.Subnet]:
         """
         Create a public Subnet in our VPC and make it publicly accessible
         """
 
         _subnets: List[aws.ec2.Subnet] = []
-        _subet_ids: List[pulumi.Output[str]] = []
 
-        for zone in self._zones.names:
+        for zone in zones:
             _subnet = aws.ec2.Subnet(f"{self.name}-subnet-public-{zone}",
                 vpc_id=self.vpc.id,
                 cidr_block=str(self._subnets.pop()),
                 availability_zone=zone,
                 map_public_ip_on_launch=True,
+                tags={
+                    # Subnet auto-discovery for internet-facing load balancers
+                    'kubernetes.io/role/elb': '1',
+                },
                 opts=pulumi.ResourceOptions(
                     parent=self.vpc
                 )
@@ -137,23 +158,26 @@ class LandingZone(pulumi.ComponentResource):
             )
 
             _subnets.append(_subnet)
-            _subet_ids.append(_subnet.id)
 
-        return _subnets, _subet_ids
+        return _subnets
 
-    def _create_private_subnets(self) -> List[aws.ec2.Subnet]:
+    def _create_private_subnets(self, zones: List[str]) -> List[aws.ec2.Subnet]:
         """
         Create a private Subnet in our VPC
         """
 
         _subnets: List[aws.ec2.Subnet] = []
 
-        for zone in self._zones.names:
+        for zone in zones:
             _subnet = aws.ec2.Subnet(f"{self.name}-subnet-private-{zone}",
                 vpc_id=self.vpc.id,
                 cidr_block=str(self._subnets.pop()),
                 availability_zone=zone,
                 map_public_ip_on_launch=True,
+                tags={
+                    # Subnet auto-discovery for internal load balancers
+                    'kubernetes.io/role/internal-elb': '1',
+                },
                 opts=pulumi.ResourceOptions(
                     parent=self.vpc
                 )
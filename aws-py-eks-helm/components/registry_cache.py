@@ -0,0 +1,164 @@
+"""
+Registry Cache Component resource.
+ECR pull-through cache rules so container images are pulled from within the region
+"""
+from typing import Optional, Dict, List
+import hashlib
+import re
+
+import pulumi
+import pulumi_aws as aws
+
+
+class RegistryCache(pulumi.ComponentResource):
+    """
+    Registry Cache Component resource
+    """
+
+    UPSTREAM_REGISTRIES = {
+        "docker-hub": "registry-1.docker.io",
+        "k8s": "registry.k8s.io",
+        "ecr-public": "public.ecr.aws",
+    }
+    """
+    The upstream registries cached, keyed by their name in this component
+    """
+
+    MAX_PREFIX_LENGTH = 30
+    """
+    The maximum length of an ECR pull-through cache repository prefix
+    """
+
+    CREDENTIALS_REQUIRED = ["docker-hub"]
+    """
+    The upstream registries which can only be cached with credentials
+    """
+
+    owner: Optional[pulumi.Input[str]]
+    """
+    The project owner who is responsible for this registry cache
+    """
+
+    rules: Dict[str, aws.ecr.PullThroughCacheRule]
+    """
+    The pull-through cache rules, keyed by upstream registry name
+    """
+
+    registry_urls: Dict[str, pulumi.Output[str]]
+    """
+    The ECR registry URLs to pull upstream images from, keyed by upstream
+    registry name. `docker.io/bitnami/apache` becomes
+    `{registry_urls['docker-hub']}/bitnami/apache`
+    """
+
+    def __init__(self, name,
+                 owner: Optional[pulumi.Input[str]],
+                 docker_hub_username: Optional[pulumi.Input[str]] = None,
+                 docker_hub_access_token: Optional[pulumi.Input[str]] = None,
+                 opts=None):
+        """
+        Class constructor
+
+        Docker Hub is only cached when credentials are provided. ECR prefixes
+        are unique per account and region, so they are scoped to this stack.
+        """
+        super().__init__('custom:components:RegistryCache', name, {}, opts)
+
+        self.name = name
+
+        if owner is not None:
+            self.owner = owner
+        else:
+            self.owner = "unclaimed-project@example.net"
+
+        self._credentials: Dict[str, pulumi.Input[str]] = {}
+        if docker_hub_username is not None and docker_hub_access_token is not None:
+            self._credentials["docker-hub"] = self._create_credentials(
+                "docker-hub", docker_hub_username, docker_hub_access_token
+            )
+
+        self._region = aws.get_region_output().name
+        self._prefixes = {
+            upstream: self._repository_prefix(upstream) for upstream in self.UPSTREAM_REGISTRIES
+        }
+        self.rules = self._create_rules()
+        self.registry_urls = self._generate_registry_urls()
+
+    @property
+    def repository_prefixes(self) -> List[str]:
+        """
+        The ECR repository prefixes served by this cache
+        """
+        return [self._prefixes[upstream] for upstream in self.rules]
+
+    def _repository_prefix(self, upstream: str) -> str:
+        """
+        Generate the ECR repository prefix of an upstream registry for this
+        stack, e.g. `myproject-dev/docker-hub`
+        """
+        _scope = re.sub(r"[^a-z0-9]+", "-", f"{pulumi.get_project()}-{pulumi.get_stack()}".lower()).strip("-")
+        _max_scope_length = self.MAX_PREFIX_LENGTH - len(upstream) - 1
+
+        if len(_scope) > _max_scope_length:
+            # Keep the prefix unique, and within the ECR limits
+            _digest = hashlib.sha1(_scope.encode("utf-8")).hexdigest()[:8]
+            _scope = f"{_scope[:_max_scope_length - 9].rstrip('-')}-{_digest}"
+
+        return f"{_scope}/{upstream}"
+
+    def _create_credentials(self, prefix: str,
+                            username: pulumi.Input[str],
+                            access_token: pulumi.Input[str]) -> pulumi.Output[str]:
+        """
+        Store the upstream registry credentials in Secrets Manager, ECR
+        requires the secret name to start with `ecr-pullthroughcache/`
+        """
+        _secret = aws.secretsmanager.Secret(f"{self.name}-ptc-{prefix}-secret",
+            name_prefix=f"ecr-pullthroughcache/{self.name}-{prefix}-",
+            tags={
+                'Owner': self.owner,
+            },
+            opts=pulumi.ResourceOptions(parent=self)
+        )
+
+        aws.secretsmanager.SecretVersion(f"{self.name}-ptc-{prefix}-secret-version",
+            secret_id=_secret.id,
+            secret_string=pulumi.Output.secret(pulumi.Output.json_dumps({
+                "username": username,
+                "accessToken": access_token,
+            })),
+            opts=pulumi.ResourceOptions(parent=_secret)
+        )
+
+        return _secret.arn
+
+    def _create_rules(self) -> Dict[str, aws.ecr.PullThroughCacheRule]:
+        """
+        Create a pull-through cache rule for each upstream registry
+        """
+        _rules: Dict[str, aws.ecr.PullThroughCacheRule] = {}
+
+        for upstream, upstream_url in self.UPSTREAM_REGISTRIES.items():
+            if upstream in self.CREDENTIALS_REQUIRED and upstream not in self._credentials:
+                pulumi.log.warn(f"no credentials for '{upstream_url}', its images will still be pulled "
+                                "from upstream", self)
+                continue
+
+            _rules[upstream] = aws.ecr.PullThroughCacheRule(f"{self.name}-ptc-{upstream}",
+                ecr_repository_prefix=self._prefixes[upstream],
+                upstream_registry_url=upstream_url,
+                credential_arn=self._credentials.get(upstream),
+                opts=pulumi.ResourceOptions(parent=self)
+            )
+
+        return _rules
+
+    def _generate_registry_urls(self) -> Dict[str, pulumi.Output[str]]:
+        """
+        Generate the regional ECR URL serving each upstream registry
+        """
+        return {
+            upstream: pulumi.Output.format("{0}.dkr.ecr.{1}.amazonaws.com/{2}",
+                rule.registry_id, self._region, rule.ecr_repository_prefix)
+            for upstream, rule in self.rules.items()
+        }
@@ -15,9 +15,20 @@ service_name = config.require("service_name")
 # Create new resource group
 resource_group = resources.ResourceGroup(f"{service_name}-rg")
 
+# Reuse a pre-generated SSH public key, from a config secret or from a stack
+# exporting `sshPublicKey`, to avoid generating a new key for every short-lived stack
+ssh_public_key = config.get_secret("sshPublicKey")
+ssh_key_stack = config.get("sshKeyStackReference") or None
+if ssh_public_key is None and ssh_key_stack is not None:
+    ssh_public_key = pulumi.StackReference(ssh_key_stack).require_output("sshPublicKey")
+
 app_cluster = cluster_component(f"{service_name}-cluster-component",
                                 service_name,
-                                resource_group.name)
+                                resource_group.name,
+                                node_local_dns=config.get_object("nodeLocalDns") if config.get("nodeLocalDns") else None,
+                                network_profile=config.get("networkProfile") or "kubenet",
+                                vm_size=config.get("vmSize") or "Standard_DS2_v2",
+                                ssh_public_key=ssh_public_key)
 
 namespace = k8s.core.v1.Namespace(f"{service_name}-k8s-ns",
                                   metadata=k8s.meta.v1.ObjectMetaArgs(
@@ -41,4 +52,5 @@ apache_service = apache_chart.get_resource("v1/Service",
 apache_service_ip = apache_service.status.load_balancer.ingress[0].ip
 
 pulumi.export("kubeconfig", app_cluster.kubeconfig)
+pulumi.export("network_profile", app_cluster.network_profile)
 pulumi.export('apache_service_ip', apache_service_ip)
@@ -1,6 +1,7 @@
 """Custom manage cluster"""
 
 import base64
+import re
 import pulumi
 import pulumi_azuread as azuread
 import pulumi_kubernetes as k8s
@@ -9,11 +10,84 @@ import pulumi_tls as tls
 from pulumi.resource import ResourceOptions
 from pulumi_azure_native import containerservice
 
+from components.nodelocaldns import NodeLocalDnsCache, check_node_local_dns_args
+
+# AKS network profiles, keyed by name, with the max pods per node they allow
+NETWORK_PROFILES = {
+    # AKS default, kubenet with route tables and iptables service routing
+    "kubenet": (None, 11),
+    # Pods get IPs from an overlay CIDR, services are routed by Cilium eBPF
+    "azure-cni-overlay-cilium": ({
+        "network_plugin": "azure",
+        "network_plugin_mode": "overlay",
+        "network_dataplane": "cilium",
+        "network_policy": "cilium",
+        "pod_cidr": "192.168.0.0/16",
+    }, 110),
+}
+
+def check_ssh_public_key(public_key):
+    """Make sure an OpenSSH public key can be used by AKS, which only accepts RSA keys"""
+    if not public_key.startswith("ssh-rsa "):
+        raise ValueError("AKS only accepts RSA SSH public keys ('ssh-rsa ...') in the node Linux profile")
+    return public_key
+
+def supports_accelerated_networking(vm_size):
+    """Best effort check whether a VM size supports accelerated networking
+
+    Accelerated networking needs at least 2 vCPUs and isn't available on the
+    A-series and B-series (before v2) sizes. Constrained vCPU sizes (e.g.
+    `Standard_E4-2ds_v5`) follow their full size. Returns None when the size
+    name can't be parsed.
+    """
+    match = re.match(r"^Standard_([A-Z]+)(\d+)(?:-\d+)?[a-z]*(?:_[A-Z]+\d+)?(?:_v(\d+))?$", vm_size)
+    if match is None:
+        return None
+
+    family, vcpus, version = match.group(1), int(match.group(2)), match.group(3)
+    if vcpus < 2:
+        return False
+    if family.startswith("A"):
+        return False
+    if family.startswith("B") and version is None:
+        return False
+    return True
+
 class K8sClusterComponent(pulumi.ComponentResource):
     """Custom Kubernetes Cluster Component"""
-    def __init__(self, name, service_name, resource_group_name, opts=None):
+    def __init__(self, name, service_name, resource_group_name, node_local_dns=None,
+                 network_profile="kubenet", vm_size="Standard_DS2_v2",
+                 ssh_public_key=None, opts=None):
+        """Create the cluster component
+
+        When `ssh_public_key` is set (e.g. a shared RSA key from config or a
+        stack reference), no key is generated and short-lived stacks skip the
+        RSA key generation.
+        """
         super().__init__('pkg:index:Cluster', name, {}, opts)
 
+        if node_local_dns is not None:
+            check_node_local_dns_args(node_local_dns)
+
+        if network_profile not in NETWORK_PROFILES:
+            raise ValueError(f"unsupported network profile '{network_profile}', "
+                             f"expected one of: {', '.join(NETWORK_PROFILES)}")
+
+        self.network_profile = network_profile
+        self.network_profile_args, max_pods = NETWORK_PROFILES[network_profile]
+
+        if (self.network_profile_args or {}).get("network_dataplane") == "cilium" and node_local_dns is not None:
+            raise ValueError(f"network profile '{network_profile}' doesn't support NodeLocal DNSCache, "
+                             "Cilium replaces kube-proxy so queries sent to the kube-dns service IP "
+                             "would never reach the cache")
+
+        accelerated_networking = supports_accelerated_networking(vm_size)
+        if accelerated_networking is None:
+            pulumi.log.warn(f"unable to tell whether '{vm_size}' supports accelerated networking", self)
+        elif not accelerated_networking:
+            pulumi.log.warn(f"'{vm_size}' does not support accelerated networking, "
+                            "node network performance will suffer", self)
+
         # Create an AD service principal
         ad_app = azuread.Application(f"{service_name}-aks",
                                      display_name=f"{service_name}-aks",
@@ -29,11 +103,18 @@ class K8sClusterComponent(pulumi.ComponentResource):
                                                         end_date="2099-01-01T00:00:00Z",
                                                         opts=ResourceOptions(parent=self))
 
-        # Generate an SSH key
-        ssh_key = tls.PrivateKey(f"{service_name}-ssh-key",
-                                 algorithm="RSA",
-                                 rsa_bits=4096,
-                                 opts=ResourceOptions(parent=self))
+        # Use the pre-generated SSH key, or generate one
+        self.ssh_key = None
+        if ssh_public_key is None:
+            self.ssh_key = tls.PrivateKey(f"{service_name}-ssh-key",
+                                          algorithm="RSA",
+                                          rsa_bits=4096,
+                                          opts=ResourceOptions(parent=self))
+            ssh_public_key = self.ssh_key.public_key_openssh
+        elif isinstance(ssh_public_key, str):
+            check_ssh_public_key(ssh_public_key)
+        else:
+            ssh_public_key = pulumi.Output.from_input(ssh_public_key).apply(check_ssh_public_key)
 
         # Create the managed cluster
         managed_cluster_name = f"{service_name}-cluster"
@@ -42,14 +123,14 @@ class K8sClusterComponent(pulumi.ComponentResource):
             resource_group_name=resource_group_name,
             agent_pool_profiles=[{
                 "count": 3,
-                "max_pods": 11,
+                "max_pods": max_pods,
                 "mode": "System",
                 "name": "agentpool",
                 "node_labels": {},
                 "os_disk_size_gb": 30,
                 "os_type": "Linux",
                 "type": "VirtualMachineScaleSets",
-                "vm_size": "Standard_DS2_v2",
+                "vm_size": vm_size,
             }],
             enable_rbac=True,
             kubernetes_version="1.29.2",
@@ -57,11 +138,12 @@ class K8sClusterComponent(pulumi.ComponentResource):
                 "admin_username": "aureq",
                 "ssh": {
                     "public_keys": [{
-                        "key_data": ssh_key.public_key_openssh,
+                        "key_data": ssh_public_key,
                     }],
                 },
             },
             dns_prefix=resource_group_name,
+            network_profile=self.network_profile_args,
             node_resource_group=f"{managed_cluster_name}-node-rg",
             service_principal_profile={
                 "client_id": ad_app.client_id,
@@ -81,3 +163,11 @@ class K8sClusterComponent(pulumi.ComponentResource):
         self.provider = k8s.Provider(f"{service_name}-k8s-provider",
                                      kubeconfig=self.kubeconfig,
                                      opts=ResourceOptions(parent=self))
+
+        # Optionally deploy the NodeLocal DNSCache add-on
+        self.node_local_dns = None
+        if node_local_dns is not None:
+            self.node_local_dns = NodeLocalDnsCache(f"{service_name}-nodelocaldns",
+                                                    kubernetes_provider=self.provider,
+                                                    **node_local_dns,
+                                                    opts=ResourceOptions(parent=self))
@@ -0,0 +1,352 @@
+"""
+NodeLocal DNSCache Component resource.
+Runs a DNS caching agent on every node to take load off CoreDNS
+"""
+from typing import Optional, List, TypedDict
+
+import pulumi
+import pulumi_kubernetes as k8s
+
+
+class NodeLocalDnsCacheArgs(TypedDict, total=False):
+    """
+    Optional settings accepted by `NodeLocalDnsCache`
+    """
+
+    local_ip: str
+    dns_domain: str
+    cache_success_size: int
+    cache_success_ttl: int
+    cache_denial_size: int
+    cache_denial_ttl: int
+    upstream_servers: List[str]
+    force_tcp: bool
+    image: str
+
+
+def check_node_local_dns_args(args: dict) -> NodeLocalDnsCacheArgs:
+    """
+    Make sure only settings accepted by `NodeLocalDnsCache` are provided
+    """
+    _allowed = NodeLocalDnsCacheArgs.__annotations__
+    _unknown = sorted(set(args) - set(_allowed))
+    if _unknown:
+        raise ValueError(f"unsupported NodeLocal DNSCache settings: {', '.join(_unknown)}, "
+                         f"expected any of: {', '.join(_allowed)}")
+
+    return args
+
+
+class NodeLocalDnsCache(pulumi.ComponentResource):
+    """
+    NodeLocal DNSCache Component resource
+
+    The cache binds to both a link-local address and the `kube-dns` service
+    IP on every node, so pods keep using their existing resolver settings.
+    """
+
+    NAMESPACE = "kube-system"
+    APP_NAME = "node-local-dns"
+
+    kube_dns_ip: pulumi.Output[str]
+    """
+    The cluster IP of the `kube-dns` service intercepted on each node
+    """
+
+    service_account: k8s.core.v1.ServiceAccount
+    """
+    The service account used by the cache agents
+    """
+
+    config_map: k8s.core.v1.ConfigMap
+    """
+    The CoreDNS configuration used by the cache
+    """
+
+    daemon_set: k8s.apps.v1.DaemonSet
+    """
+    The cache agents running on every node
+    """
+
+    def __init__(self, name,
+                 kubernetes_provider: k8s.Provider,
+                 local_ip: str = "169.254.20.10",
+                 dns_domain: str = "cluster.local",
+                 cache_success_size: int = 9984,
+                 cache_success_ttl: int = 30,
+                 cache_denial_size: int = 9984,
+                 cache_denial_ttl: int = 5,
+                 upstream_servers: Optional[List[str]] = None,
+                 force_tcp: bool = True,
+                 image: str = "registry.k8s.io/dns/k8s-dns-node-cache:1.23.1",
+                 opts=None):
+        """
+        Class constructor
+
+        `upstream_servers` are used to resolve names outside the cluster
+        domain, the node `/etc/resolv.conf` is used when unset.
+        """
+        super().__init__('pkg:index:NodeLocalDnsCache', name, {}, opts)
+
+        self.name = name
+        self.kubernetes_provider = kubernetes_provider
+        self.local_ip = local_ip
+        self.dns_domain = dns_domain
+        self.cache_success_size = cache_success_size
+        self.cache_success_ttl = cache_success_ttl
+        self.cache_denial_size = cache_denial_size
+        self.cache_denial_ttl = cache_denial_ttl
+        self.force_tcp = force_tcp
+        self.image = image
+
+        if upstream_servers:
+            self.upstream_servers = " ".join(upstream_servers)
+        else:
+            # Substituted by node-cache with the node nameservers
+            self.upstream_servers = "__PILLAR__UPSTREAM__SERVERS__"
+
+        self.kube_dns_ip = self._get_kube_dns_ip()
+        self.service_account = self._create_service_account()
+        self._create_upstream_service()
+        self.config_map = self._create_config_map()
+        self.daemon_set = self._create_daemon_set()
+        self._create_metrics_service()
+
+    def _resource_options(self, **kwargs) -> pulumi.ResourceOptions:
+        """
+        Resource options shared by every Kubernetes object of this component
+        """
+        return pulumi.ResourceOptions(
+            parent=self,
+            provider=self.kubernetes_provider,
+            **kwargs
+        )
+
+    def _metadata(self, name: str) -> k8s.meta.v1.ObjectMetaArgs:
+        """
+        Metadata shared by every Kubernetes object of this component
+        """
+        return k8s.meta.v1.ObjectMetaArgs(
+            name=name,
+            namespace=self.NAMESPACE,
+            labels={
+                "k8s-app": self.APP_NAME,
+            }
+        )
+
+    def _get_kube_dns_ip(self) -> pulumi.Output[str]:
+        """
+        Look up the cluster IP of the existing `kube-dns` service
+        """
+        _kube_dns = k8s.core.v1.Service.get(f"{self.name}-kube-dns",
+            f"{self.NAMESPACE}/kube-dns",
+            opts=self._resource_options()
+        )
+
+        return _kube_dns.spec.cluster_ip
+
+    def _create_service_account(self) -> k8s.core.v1.ServiceAccount:
+        """
+        Create the service account used by the cache agents
+        """
+        return k8s.core.v1.ServiceAccount(f"{self.name}-node-local-dns-sa",
+            metadata=self._metadata(self.APP_NAME),
+            opts=self._resource_options()
+        )
+
+    def _create_upstream_service(self) -> k8s.core.v1.Service:
+        """
+        Create a second service in front of CoreDNS, the cache forwards cache
+        misses to it since the `kube-dns` service IP is captured on each node
+        """
+        return k8s.core.v1.Service(f"{self.name}-kube-dns-upstream",
+            metadata=self._metadata("kube-dns-upstream"),
+            spec=k8s.core.v1.ServiceSpecArgs(
+                selector={
+                    "k8s-app": "kube-dns",
+                },
+                ports=[
+                    k8s.core.v1.ServicePortArgs(name="dns", port=53, protocol="UDP", target_port=53),
+                    k8s.core.v1.ServicePortArgs(name="dns-tcp", port=53, protocol="TCP", target_port=53),
+                ]
+            ),
+            opts=self._resource_options()
+        )
+
+    def _create_config_map(self) -> k8s.core.v1.ConfigMap:
+        """
+        Create the CoreDNS configuration for the cache
+        """
+        _force_tcp = " {\n        force_tcp\n    }" if self.force_tcp else ""
+
+        def _corefile(kube_dns_ip: str) -> str:
+            _bind = f"{self.local_ip} {kube_dns_ip}"
+            _cluster_zones = [self.dns_domain, "in-addr.arpa", "ip6.arpa"]
+
+            _blocks = []
+            for zone in _cluster_zones:
+                if zone == self.dns_domain:
+                    _cache = (
+                        "cache {\n"
+                        f"        success {self.cache_success_size} {self.cache_success_ttl}\n"
+                        f"        denial {self.cache_denial_size} {self.cache_denial_ttl}\n"
+                        "    }"
+                    )
+                    _health = f"\n    health {self.local_ip}:8080"
+                else:
+                    _cache = f"cache {self.cache_success_ttl}"
+                    _health = ""
+
+                _blocks.append(
+                    f"{zone}:53 {{\n"
+                    "    errors\n"
+                    f"    {_cache}\n"
+                    "    reload\n"
+                    "    loop\n"
+                    f"    bind {_bind}\n"
+                    f"    forward . __PILLAR__CLUSTER__DNS__{_force_tcp}\n"
+                    f"    prometheus :9253{_health}\n"
+                    "}\n"
+                )
+
+            _blocks.append(
+                ".:53 {\n"
+                "    errors\n"
+                f"    cache {self.cache_success_ttl}\n"
+                "    reload\n"
+                "    loop\n"
+                f"    bind {_bind}\n"
+                f"    forward . {self.upstream_servers}\n"
+                "    prometheus :9253\n"
+                "}\n"
+            )
+
+            return "".join(_blocks)
+
+        return k8s.core.v1.ConfigMap(f"{self.name}-node-local-dns-cm",
+            metadata=self._metadata(self.APP_NAME),
+            data={
+                "Corefile": self.kube_dns_ip.apply(_corefile),
+            },
+            opts=self._resource_options()
+        )
+
+    def _create_daemon_set(self) -> k8s.apps.v1.DaemonSet:
+        """
+        Create the cache agents, one per node on the host network
+        """
+        _labels = {
+            "k8s-app": self.APP_NAME,
+        }
+
+        return k8s.apps.v1.DaemonSet(f"{self.name}-node-local-dns-ds",
+            metadata=self._metadata(self.APP_NAME),
+            spec=k8s.apps.v1.DaemonSetSpecArgs(
+                selector=k8s.meta.v1.LabelSelectorArgs(
+                    match_labels=_labels
+                ),
+                update_strategy=k8s.apps.v1.DaemonSetUpdateStrategyArgs(
+                    rolling_update=k8s.apps.v1.RollingUpdateDaemonSetArgs(
+                        max_unavailable="10%"
+                    )
+                ),
+                template=k8s.core.v1.PodTemplateSpecArgs(
+                    metadata=k8s.meta.v1.ObjectMetaArgs(
+                        labels=_labels,
+                        annotations={
+                            "prometheus.io/port": "9253",
+                            "prometheus.io/scrape": "true",
+                        }
+                    ),
+                    spec=k8s.core.v1.PodSpecArgs(
+                        priority_class_name="system-node-critical",
+                        service_account_name=self.APP_NAME,
+                        host_network=True,
+                        dns_policy="Default",
+                        tolerations=[
+                            k8s.core.v1.TolerationArgs(key="CriticalAddonsOnly", operator="Exists"),
+                            k8s.core.v1.TolerationArgs(effect="NoExecute", operator="Exists"),
+                            k8s.core.v1.TolerationArgs(effect="NoSchedule", operator="Exists"),
+                        ],
+                        containers=[k8s.core.v1.ContainerArgs(
+                            name="node-cache",
+                            image=self.image,
+                            args=[
+                                "-localip", self.kube_dns_ip.apply(lambda ip: f"{self.local_ip},{ip}"),
+                                "-conf", "/etc/Corefile",
+                                "-upstreamsvc", "kube-dns-upstream",
+                            ],
+                            resources=k8s.core.v1.ResourceRequirementsArgs(
+                                requests={
+                                    "cpu": "25m",
+                                    "memory": "5Mi",
+                                }
+                            ),
+                            security_context=k8s.core.v1.SecurityContextArgs(
+                                capabilities=k8s.core.v1.CapabilitiesArgs(
+                                    add=["NET_ADMIN"]
+                                )
+                            ),
+                            ports=[
+                                k8s.core.v1.ContainerPortArgs(name="dns", container_port=53, protocol="UDP"),
+                                k8s.core.v1.ContainerPortArgs(name="dns-tcp", container_port=53, protocol="TCP"),
+                                k8s.core.v1.ContainerPortArgs(name="metrics", container_port=9253, protocol="TCP"),
+                            ],
+                            liveness_probe=k8s.core.v1.ProbeArgs(
+                                http_get=k8s.core.v1.HTTPGetActionArgs(
+                                    host=self.local_ip,
+                                    path="/health",
+                                    port=8080
+                                ),
+                                initial_delay_seconds=60,
+                                timeout_seconds=5
+                            ),
+                            volume_mounts=[
+                                k8s.core.v1.VolumeMountArgs(name="xtables-lock", mount_path="/run/xtables.lock"),
+                                k8s.core.v1.VolumeMountArgs(name="config-volume", mount_path="/etc/coredns"),
+                            ]
+                        )],
+                        volumes=[
+                            k8s.core.v1.VolumeArgs(
+                                name="xtables-lock",
+                                host_path=k8s.core.v1.HostPathVolumeSourceArgs(
+                                    path="/run/xtables.lock",
+                                    type="FileOrCreate"
+                                )
+                            ),
+                            k8s.core.v1.VolumeArgs(
+                                name="config-volume",
+                                config_map=k8s.core.v1.ConfigMapVolumeSourceArgs(
+                                    name=self.config_map.metadata.name,
+                                    items=[k8s.core.v1.KeyToPathArgs(
+                                        key="Corefile",
+                                        path="Corefile.base"
+                                    )]
+                                )
+                            ),
+                        ]
+                    )
+                )
+            ),
+            opts=self._resource_options(depends_on=[self.service_account])
+        )
+
+    def _create_metrics_service(self) -> k8s.core.v1.Service:
+        """
+        Create a headless service exposing the cache metrics
+        """
+        return k8s.core.v1.Service(f"{self.name}-node-local-dns-svc",
+            metadata=self._metadata(self.APP_NAME),
+            spec=k8s.core.v1.ServiceSpecArgs(
+                cluster_ip="None",
+                selector={
+                    "k8s-app": self.APP_NAME,
+                },
+                ports=[k8s.core.v1.ServicePortArgs(
+                    name="metrics",
+                    port=9253,
+                    target_port=9253
+                )]
+            ),
+            opts=self._resource_options()
+        )
@@ -0,0 +1,116 @@
+"""Unit tests for the custom cluster component"""
+
+import base64
+import unittest
+
+import pulumi
+
+
+class ClusterMocks(pulumi.runtime.Mocks):
+    """Echo the resource inputs back and return a dummy kubeconfig"""
+    def new_resource(self, args: pulumi.runtime.MockResourceArgs):
+        outputs = dict(args.inputs)
+        if args.typ == "tls:index/privateKey:PrivateKey":
+            outputs["publicKeyOpenssh"] = "ssh-rsa AAAA test"
+        return [f"{args.name}_id", outputs]
+
+    def call(self, args: pulumi.runtime.MockCallArgs):
+        if args.token == "azure-native:containerservice:listManagedClusterUserCredentials":
+            return {
+                "kubeconfigs": [{
+                    "name": "clusterUser",
+                    "value": base64.b64encode(b"apiVersion: v1").decode(),
+                }],
+            }
+        return {}
+
+
+pulumi.runtime.set_mocks(ClusterMocks(), preview=False)
+
+# pylint: disable=wrong-import-position
+from components.cluster import K8sClusterComponent, supports_accelerated_networking
+
+
+class TestK8sClusterComponent(unittest.TestCase):
+    """K8sClusterComponent network profiles"""
+
+    @pulumi.runtime.test
+    def test_kubenet_network_profile(self):
+        cluster = K8sClusterComponent("test-cluster-component", "test", "test-rg")
+        self.assertEqual(cluster.network_profile, "kubenet")
+
+        def check(args):
+            network_profile, agent_pool_profiles = args
+            self.assertIsNone(network_profile)
+            self.assertEqual(agent_pool_profiles[0]["max_pods"], 11)
+
+        return pulumi.Output.all(cluster.managed_cluster.network_profile,
+                                 cluster.managed_cluster.agent_pool_profiles).apply(check)
+
+    @pulumi.runtime.test
+    def test_azure_cni_overlay_cilium_network_profile(self):
+        cluster = K8sClusterComponent("test-cluster-component", "test", "test-rg",
+                                      network_profile="azure-cni-overlay-cilium")
+        self.assertEqual(cluster.network_profile, "azure-cni-overlay-cilium")
+
+        def check(args):
+            network_profile, agent_pool_profiles = args
+            self.assertEqual(network_profile["network_plugin"], "azure")
+            self.assertEqual(network_profile["network_plugin_mode"], "overlay")
+            self.assertEqual(network_profile["network_dataplane"], "cilium")
+            self.assertEqual(agent_pool_profiles[0]["max_pods"], 110)
+
+        return pulumi.Output.all(cluster.managed_cluster.network_profile,
+                                 cluster.managed_cluster.agent_pool_profiles).apply(check)
+
+    def test_cilium_rejects_node_local_dns(self):
+        with self.assertRaises(ValueError):
+            K8sClusterComponent("test-cluster-component", "test", "test-rg",
+                                network_profile="azure-cni-overlay-cilium",
+                                node_local_dns={})
+
+    def test_unknown_node_local_dns_setting(self):
+        with self.assertRaises(ValueError):
+            K8sClusterComponent("test-cluster-component", "test", "test-rg",
+                                node_local_dns={"cacheSuccessSize": 20000})
+
+    def test_unknown_network_profile(self):
+        with self.assertRaises(ValueError):
+            K8sClusterComponent("test-cluster-component", "test", "test-rg",
+                                network_profile="flannel")
+
+
+class TestSshKey(unittest.TestCase):
+    """K8sClusterComponent SSH key material"""
+
+    def test_ed25519_public_key_rejected(self):
+        with self.assertRaises(ValueError):
+            K8sClusterComponent("test-cluster-component", "test", "test-rg",
+                                ssh_public_key="ssh-ed25519 AAAA test")
+
+    @pulumi.runtime.test
+    def test_pre_generated_public_key(self):
+        cluster = K8sClusterComponent("test-cluster-component", "test", "test-rg",
+                                      ssh_public_key="ssh-rsa AAAA shared")
+        self.assertIsNone(cluster.ssh_key)
+
+        def check(linux_profile):
+            self.assertEqual(linux_profile["ssh"]["public_keys"][0]["key_data"], "ssh-rsa AAAA shared")
+
+        return cluster.managed_cluster.linux_profile.apply(check)
+
+
+class TestAcceleratedNetworking(unittest.TestCase):
+    """supports_accelerated_networking VM size check"""
+
+    def test_supported_sizes(self):
+        for vm_size in ["Standard_DS2_v2", "Standard_D4s_v5", "Standard_E4-2ds_v5",
+                        "Standard_D16-4s_v5", "Standard_NC4as_T4_v3"]:
+            self.assertTrue(supports_accelerated_networking(vm_size), vm_size)
+
+    def test_unsupported_sizes(self):
+        for vm_size in ["Standard_DS1_v2", "Standard_A2_v2", "Standard_B2ms"]:
+            self.assertFalse(supports_accelerated_networking(vm_size), vm_size)
+
+    def test_unknown_sizes(self):
+        self.assertIsNone(supports_accelerated_networking("Basic_A1"))